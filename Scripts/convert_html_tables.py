@@ -5,27 +5,40 @@ Convert HTML tables in a directory to Parquet and CSV using Pandas.
 Assumptions:
 - Each HTML file contains a single <table> element (as provided by the user).
 - Outputs are written alongside the source HTML by default, with the same stem
-  and .parquet / .csv extensions.
+  and a .parquet extension. Pass --formats csv for CSV only, or --formats both
+  to write CSV files as well.
 
 Usage:
   python Scripts/convert_html_tables.py \
     --input-dir Dictionaries \
-    --output-dir Dictionaries
+    --output-dir Dictionaries \
+    --formats both
 
 Dependencies:
-- pandas (for HTML parsing) + one of: lxml, html5lib, or beautifulsoup4
-- pyarrow or fastparquet (for writing Parquet)
+- pandas + lxml (for HTML parsing); beautifulsoup4 + html5lib are only needed
+  as a fallback for documents lxml cannot parse
+- pyarrow (for writing Parquet)
 """
 
 from __future__ import annotations
 
 import argparse
+import io
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from typing import Iterable, List
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import re
+from lxml.etree import XMLSyntaxError
+
+
+_PARQUET_ROW_GROUP_SIZE = 64_000
 
 
 def find_html_files(directory: Path) -> List[Path]:
@@ -48,25 +61,43 @@ def flatten_pandas_columns(columns: Iterable) -> List[str]:
     return flat
 
 
+# Known responsive labels like "Name", "Title", "Type", "Description", "Is Searchable"
+# that get embedded like "Name <value>" due to small-screen tablesaw markup.
+_LABEL_RE = re.compile(r"^(Name|Title|Type|Description|Is\s+Searchable)\s+")
+
+
 def strip_label_prefix(text: str) -> str:
-    # Remove known responsive labels like "Name", "Title", "Type", "Description", "Is Searchable"
-    # when they are embedded like "Name <value>" due to small-screen tablesaw markup.
+    # Scalar fallback used for columns that mix strings with other values.
     if not isinstance(text, str):
         return text
-    pattern = r"^(Name|Title|Type|Description|Is\s+Searchable)\s+"
-    return re.sub(pattern, "", text).strip()
+    return _LABEL_RE.sub("", text).strip()
 
 
 def remove_embedded_labels(df: pd.DataFrame) -> pd.DataFrame:
     cleaned = df.copy()
     for col in cleaned.columns:
-        cleaned[col] = cleaned[col].apply(strip_label_prefix)
+        if pd.api.types.infer_dtype(cleaned[col], skipna=True) == "string":
+            # All non-null cells are text, so use the vectorized string methods.
+            cleaned[col] = cleaned[col].str.replace(_LABEL_RE, "", regex=True).str.strip()
+        else:
+            cleaned[col] = cleaned[col].apply(strip_label_prefix)
     return cleaned
 
 
+def read_html_tables(html_path: Path) -> List[pd.DataFrame]:
+    # Force the lxml parser so pandas does not silently fall back to the much slower
+    # BeautifulSoup path; only documents lxml cannot parse at all are retried with bs4.
+    content = io.BytesIO(html_path.read_bytes())
+    try:
+        return pd.read_html(content, flavor="lxml")
+    except XMLSyntaxError:
+        content.seek(0)
+        return pd.read_html(content, flavor="bs4")
+
+
 def read_html_to_pandas(html_path: Path) -> pd.DataFrame:
     try:
-        tables = pd.read_html(html_path)
+        tables = read_html_tables(html_path)
     except ValueError as exc:  # No tables found
         raise RuntimeError(f"No <table> elements found in {html_path}") from exc
 
@@ -84,18 +115,44 @@ def read_html_to_pandas(html_path: Path) -> pd.DataFrame:
     return df
 
 
-def write_outputs(df: pd.DataFrame, out_base: Path) -> None:
-    parquet_path = out_base.with_suffix(".parquet")
-    csv_path = out_base.with_suffix(".csv")
+def write_outputs(df: pd.DataFrame, out_base: Path, formats: str = "parquet") -> List[Path]:
+    written: List[Path] = []
 
-    # Write Parquet
-    df.to_parquet(parquet_path.as_posix(), index=False)
+    if formats in ("parquet", "both"):
+        # zstd trades a little CPU for noticeably smaller files than the default snappy;
+        # dictionary encoding suits the repetitive "Type" / "Is Searchable" columns.
+        parquet_path = out_base.with_suffix(".parquet")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(
+            table,
+            parquet_path,
+            compression="zstd",
+            compression_level=3,
+            use_dictionary=True,
+            row_group_size=_PARQUET_ROW_GROUP_SIZE,
+        )
+        written.append(parquet_path)
 
-    # Write CSV
-    df.to_csv(csv_path.as_posix(), index=False)
+    if formats in ("csv", "both"):
+        csv_path = out_base.with_suffix(".csv")
+        df.to_csv(csv_path.as_posix(), index=False)
+        written.append(csv_path)
 
+    return written
 
-def convert_directory(input_dir: Path, output_dir: Path) -> None:
+
+def _convert_one(html_file: Path, output_dir: Path, formats: str) -> str:
+    # Runs in a worker process; report failures as text so one bad file doesn't kill the pool.
+    try:
+        df = read_html_to_pandas(html_file)
+        out_base = (output_dir / html_file.stem)
+        written = write_outputs(df, out_base, formats)
+        return f"Converted {html_file.name} -> {', '.join(path.name for path in written)}"
+    except Exception as exc:
+        return f"Failed to convert {html_file}: {exc}"
+
+
+def convert_directory(input_dir: Path, output_dir: Path, formats: str = "parquet") -> None:
     if not input_dir.exists() or not input_dir.is_dir():
         raise FileNotFoundError(f"Input directory not found: {input_dir}")
 
@@ -106,14 +163,11 @@ def convert_directory(input_dir: Path, output_dir: Path) -> None:
         print(f"No .html files found in {input_dir}")
         return
 
-    for html_file in html_files:
-        try:
-            df = read_html_to_pandas(html_file)
-            out_base = (output_dir / html_file.stem)
-            write_outputs(df, out_base)
-            print(f"Converted {html_file.name} -> {out_base.with_suffix('.parquet').name}, {out_base.with_suffix('.csv').name}")
-        except Exception as exc:
-            print(f"Failed to convert {html_file}: {exc}")
+    # Each file is parsed and encoded independently, so spread them across processes.
+    max_workers = min(os.cpu_count() or 1, len(html_files))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for message in executor.map(_convert_one, html_files, repeat(output_dir), repeat(formats)):
+            print(message)
 
 
 def parse_args(argv: List[str]) -> argparse.Namespace:
@@ -130,6 +184,12 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
         default=None,
         help="Directory to write outputs (default: same as --input-dir)",
     )
+    parser.add_argument(
+        "--formats",
+        choices=["parquet", "csv", "both"],
+        default="parquet",
+        help="Output formats to write (default: parquet)",
+    )
     return parser.parse_args(argv)
 
 
@@ -138,7 +198,7 @@ def main(argv: List[str]) -> int:
     input_dir: Path = args.input_dir
     output_dir: Path = args.output_dir or input_dir
     try:
-        convert_directory(input_dir.resolve(), output_dir.resolve())
+        convert_directory(input_dir.resolve(), output_dir.resolve(), args.formats)
     except Exception as exc:
         print(f"Error: {exc}", file=sys.stderr)
         return 1
@@ -3,23 +3,29 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import dataclasses
 import hashlib
+import http.client
 import json
 import logging
+import os
+import re
 import sys
-import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any, Final
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
 
+import requests
+from requests.adapters import HTTPAdapter
 
 _LOGGER = logging.getLogger(__name__)
 _DEFAULT_USER_AGENT: Final[str] = "fema-risks nfip-downloader/0.1"
 _DEFAULT_TIMEOUT: Final[float] = 60.0
 _DEFAULT_CHUNK_SIZE: Final[int] = 1 << 20  # 1 MiB
+_DEFAULT_MAX_WORKERS: Final[int] = 8
+_CONTENT_RANGE_RE: Final[re.Pattern[str]] = re.compile(r"bytes (\d+)-\d+/(?:\d+|\*)")
 
 
 @dataclasses.dataclass(slots=True)
@@ -63,14 +69,13 @@ def compute_checksum(path: Path, algorithm: str = "sha256") -> str | None:
     """Compute the hex digest for *path* using the provided algorithm."""
 
     try:
-        digest = hashlib.new(algorithm)
+        hashlib.new(algorithm)
     except ValueError:  # pragma: no cover - defensive guard
         _LOGGER.error("Unsupported checksum algorithm %s", algorithm)
         return None
     try:
         with path.open("rb") as file_obj:
-            for chunk in iter(lambda: file_obj.read(_DEFAULT_CHUNK_SIZE), b""):
-                digest.update(chunk)
+            digest = hashlib.file_digest(file_obj, algorithm)
     except FileNotFoundError:
         return None
     return digest.hexdigest()
@@ -100,23 +105,140 @@ def read_download_plan(config_path: Path) -> list[DownloadTarget]:
     return targets
 
 
-def fetch_url(target: DownloadTarget, *, timeout: float = _DEFAULT_TIMEOUT) -> bytes:
-    """Retrieve the content for *target* from FEMA."""
+def create_session(pool_size: int = _DEFAULT_MAX_WORKERS) -> requests.Session:
+    """Return a session that keeps up to *pool_size* connections per host alive."""
 
-    headers = {"User-Agent": _DEFAULT_USER_AGENT}
-    request = Request(target.url, headers=headers)
-    with urlopen(request, timeout=timeout) as response:
-        return response.read()
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
-def persist_bytes(content: bytes, destination: Path) -> None:
-    """Write *content* to *destination* atomically."""
+class StalePartialDownloadError(Exception):
+    """Raised when a ranged response does not continue the bytes already on disk."""
 
-    destination.parent.mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile(delete=False, dir=destination.parent) as tmp_file:
-        tmp_path = Path(tmp_file.name)
-        tmp_file.write(content)
-    tmp_path.replace(destination)
+
+def partial_download_path(destination: Path) -> Path:
+    """Return the path used to accumulate bytes for *destination* before it is complete."""
+
+    return destination.with_name(f"{destination.name}.part")
+
+
+def partial_validator_path(part_path: Path) -> Path:
+    """Return the sidecar recording which remote version *part_path* belongs to."""
+
+    return part_path.with_name(f"{part_path.name}.validator")
+
+
+def discard_partial_download(part_path: Path) -> None:
+    """Remove *part_path* and its validator sidecar."""
+
+    part_path.unlink(missing_ok=True)
+    partial_validator_path(part_path).unlink(missing_ok=True)
+
+
+def response_validator(response: requests.Response) -> str | None:
+    """Return a validator usable with If-Range: a strong ETag, else Last-Modified."""
+
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def content_range_start(response: requests.Response) -> int | None:
+    """Return the first byte position announced by a 206 ``Content-Range`` header."""
+
+    match = _CONTENT_RANGE_RE.fullmatch(response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+
+def continues_partial(response: requests.Response, offset: int, validator: str) -> bool:
+    """Return True when a 206 *response* picks up at *offset* of the same version."""
+
+    current = response_validator(response)
+    return content_range_start(response) == offset and current in (None, validator)
+
+
+def update_digest_from_file(digest: Any, path: Path) -> None:
+    """Feed the existing contents of *path* into *digest*."""
+
+    with path.open("rb") as file_obj:
+        while chunk := file_obj.read(_DEFAULT_CHUNK_SIZE):
+            digest.update(chunk)
+
+
+def stream_to_part_file(
+    target: DownloadTarget,
+    part_path: Path,
+    session: requests.Session,
+    *,
+    timeout: float = _DEFAULT_TIMEOUT,
+) -> str | None:
+    """Stream *target* into *part_path*, resuming from any bytes already present.
+
+    A partial file is only resumed when its validator sidecar records the ETag or
+    Last-Modified of the response it came from. The Range request carries that
+    value in If-Range, and a 206 reply is appended only if its Content-Range starts
+    at the partial file's size and its validator still matches; anything else
+    truncates the file and restarts the download. Returns the hex digest of the
+    complete payload (``None`` when the target has no checksum to validate against).
+    """
+
+    digest = hashlib.new(target.checksum_algorithm) if target.checksum else None
+    validator_path = partial_validator_path(part_path)
+    validator = (
+        validator_path.read_text(encoding="utf-8").strip()
+        if validator_path.exists()
+        else ""
+    )
+    offset = part_path.stat().st_size if validator and part_path.exists() else 0
+    # Ask for the payload as stored so byte offsets and digests match the file.
+    headers = {"User-Agent": _DEFAULT_USER_AGENT, "Accept-Encoding": "identity"}
+    if offset:
+        headers |= {"Range": f"bytes={offset}-", "If-Range": validator}
+    part_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with session.get(
+            target.url, headers=headers, stream=True, timeout=timeout
+        ) as response:
+            response.raise_for_status()
+            resumed = bool(offset) and response.status_code == 206
+            if resumed:
+                if not continues_partial(response, offset, validator):
+                    raise StalePartialDownloadError(target.url)
+                _LOGGER.info("Resuming %s from byte %d", target.name, offset)
+                if digest is not None:
+                    update_digest_from_file(digest, part_path)
+            else:
+                validator_path.unlink(missing_ok=True)
+            expected = int(response.headers.get("Content-Length", -1))
+            received = 0
+            with part_path.open("ab" if resumed else "wb") as part_file:
+                if not resumed and (current := response_validator(response)):
+                    validator_path.write_text(current, encoding="utf-8")
+                for chunk in response.iter_content(chunk_size=_DEFAULT_CHUNK_SIZE):
+                    part_file.write(chunk)
+                    received += len(chunk)
+                    if digest is not None:
+                        digest.update(chunk)
+            # urllib3 1.x ends the stream quietly when the server closes early, so
+            # compare against the announced Content-Length.
+            if received < expected:
+                raise http.client.IncompleteRead(b"", expected - received)
+    except (requests.HTTPError, StalePartialDownloadError) as error:
+        range_rejected = (
+            isinstance(error, StalePartialDownloadError)
+            or error.response.status_code == 416
+        )
+        if not offset or not range_rejected:
+            raise
+        # The partial file is not a valid prefix of the payload; start over.
+        _LOGGER.info("Discarding stale partial download for %s", target.name)
+        discard_partial_download(part_path)
+        return stream_to_part_file(target, part_path, session, timeout=timeout)
+    return digest.hexdigest() if digest is not None else None
 
 
 def download_target(
@@ -124,8 +246,13 @@ def download_target(
     output_dir: Path,
     *,
     timeout: float = _DEFAULT_TIMEOUT,
+    session: requests.Session | None = None,
 ) -> DownloadResult:
-    """Download *target* into *output_dir* and return metadata about the attempt."""
+    """Download *target* into *output_dir* and return metadata about the attempt.
+
+    Pass a shared *session* to reuse connections across targets; otherwise a
+    single-use session is opened for this download.
+    """
 
     destination = target.destination_path(output_dir)
     start = time.perf_counter()
@@ -134,23 +261,29 @@ def download_target(
             target=target, path=destination, duration_seconds=0.0, from_cache=True
         )
 
+    part_path = partial_download_path(destination)
     try:
-        content = fetch_url(target, timeout=timeout)
-    except (HTTPError, URLError) as error:
+        with (
+            create_session() if session is None else contextlib.nullcontext(session)
+        ) as active_session:
+            downloaded_digest = stream_to_part_file(
+                target, part_path, active_session, timeout=timeout
+            )
+    except (OSError, http.client.HTTPException) as error:
         _LOGGER.error(
             "Failed to download %s from %s", target.name, target.url, exc_info=error
         )
         raise
 
-    persist_bytes(content, destination)
+    if target.checksum and downloaded_digest != target.checksum.lower():
+        discard_partial_download(part_path)
+        raise ValueError(
+            "Checksum mismatch for %s: expected %s but received %s"
+            % (target.name, target.checksum.lower(), downloaded_digest),
+        )
+    os.replace(part_path, destination)
+    partial_validator_path(part_path).unlink(missing_ok=True)
     duration = time.perf_counter() - start
-    if target.checksum:
-        downloaded_digest = compute_checksum(destination, target.checksum_algorithm)
-        if downloaded_digest and downloaded_digest != target.checksum.lower():
-            raise ValueError(
-                "Checksum mismatch for %s: expected %s but received %s"
-                % (target.name, target.checksum.lower(), downloaded_digest),
-            )
     return DownloadResult(
         target=target, path=destination, duration_seconds=duration, from_cache=False
     )
@@ -211,24 +344,44 @@ def main(argv: list[str] | None = None) -> int:
         return 2
 
     output_dir: Path = args.output_dir
-    results: list[DownloadResult] = []
-    for target in targets:
-        try:
-            result = download_target(target, output_dir, timeout=args.timeout)
-        except Exception as error:  # pragma: no cover - CLI entry point
-            _LOGGER.error("Download failed for %s", target.name, exc_info=error)
-            return 1
-        results.append(result)
-        status = "cached" if result.from_cache else "downloaded"
-        _LOGGER.info(
-            "%s: %s -> %s (%.2fs)",
-            target.name,
-            status,
-            result.path,
-            result.duration_seconds,
-        )
-    if not results:
+    if not targets:
         _LOGGER.warning("No download targets specified in configuration")
+        return 0
+    max_workers = min(_DEFAULT_MAX_WORKERS, len(targets))
+    with (
+        create_session(max_workers) as session,
+        ThreadPoolExecutor(max_workers=max_workers) as executor,
+    ):
+        futures = {
+            executor.submit(
+                download_target,
+                target,
+                output_dir,
+                timeout=args.timeout,
+                session=session,
+            ): target
+            for target in targets
+        }
+        failures = 0
+        for future in as_completed(futures):
+            target = futures[future]
+            try:
+                result = future.result()
+            except Exception as error:  # pragma: no cover - CLI entry point
+                _LOGGER.error("Download failed for %s", target.name, exc_info=error)
+                failures += 1
+                continue
+            status = "cached" if result.from_cache else "downloaded"
+            _LOGGER.info(
+                "%s: %s -> %s (%.2fs)",
+                target.name,
+                status,
+                result.path,
+                result.duration_seconds,
+            )
+    if failures:
+        _LOGGER.error("%d of %d downloads failed", failures, len(targets))
+        return 1
     return 0
 
 
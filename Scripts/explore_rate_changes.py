@@ -3,12 +3,36 @@
 from __future__ import annotations
 
 import datetime as dt
+import os
+import warnings
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import TYPE_CHECKING, Iterable, Tuple
 
-import matplotlib.pyplot as plt
+import matplotlib
+import numpy as np
 import polars as pl
 
+matplotlib.use("Agg")  # Figures are only written to disk; skip interactive backends.
+import matplotlib.pyplot as plt
+
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+
+# Only these columns are read from the policy parquet; the rest are never touched.
+_POLICY_COLUMNS: Tuple[str, ...] = (
+    "policyEffectiveDate",
+    "originalNBDate",
+    "propertyState",
+    "occupancyType",
+    "censusTract",
+    "ratedFloodZone",
+    "policyCost",
+)
+# Bump when preprocess_policies changes so stale cached frames are rebuilt.
+_PREPROCESS_CACHE_VERSION = 2
+# repartition_policies.py writes one propertyState=<STATE>/ directory per state.
+_PARTITION_GLOB = "*/*.parquet"
+
 
 def prepare_directories(base_path: Path) -> Tuple[Path, Path]:
     """Create and return the data and figure directories for the project."""
@@ -20,29 +44,79 @@ def prepare_directories(base_path: Path) -> Tuple[Path, Path]:
     return data_dir, figures_dir
 
 
+def policy_partition_files(data_dir: Path) -> list[Path]:
+    """Return the files of the state-partitioned policy dataset, if it exists."""
+
+    return sorted((data_dir / "processed" / "policies_by_state").glob(_PARTITION_GLOB))
+
+
+def policy_source(data_dir: Path) -> Path:
+    """Return the state-partitioned policy dataset if it is current, else the raw parquet.
+
+    The partitioned copy is produced by ``repartition_policies.py``. It is skipped,
+    with a warning, when ``FimaNfipPoliciesV2.parquet`` has been modified since the
+    partitions were written.
+    """
+
+    raw = data_dir / "FimaNfipPoliciesV2.parquet"
+    partitioned = data_dir / "processed" / "policies_by_state"
+    partition_files = policy_partition_files(data_dir)
+    if not partition_files:
+        return raw
+    if raw.exists() and raw.stat().st_mtime_ns > max(
+        path.stat().st_mtime_ns for path in partition_files
+    ):
+        warnings.warn(
+            f"{partitioned} is older than {raw}; reading the single file instead. "
+            "Rerun repartition_policies.py to refresh the partitions.",
+            stacklevel=2,
+        )
+        return raw
+    return partitioned
+
+
 def load_policy_frame(data_dir: Path) -> pl.LazyFrame:
     """Load the FEMA policy dataset as a lazy Polars frame."""
 
-    return pl.scan_parquet(data_dir / "FimaNfipPoliciesV2.parquet")
+    return scan_policy_source(policy_source(data_dir))
 
 
-def preprocess_policies(lazy_frame: pl.LazyFrame, state: str) -> pl.DataFrame:
-    """Filter and engineer features needed for rate change exploration."""
+def scan_policy_source(source: Path) -> pl.LazyFrame:
+    """Lazily scan a policy parquet file or state-partitioned dataset."""
 
-    return (
-        lazy_frame.with_columns(
-            pl.col("policyEffectiveDate").dt.year().alias("Year"),
-            pl.col("policyEffectiveDate").dt.month().alias("Month"),
+    if source.is_dir():
+        return pl.scan_parquet(source / _PARTITION_GLOB, hive_partitioning=True).select(
+            _POLICY_COLUMNS
         )
-        .filter(
-            (pl.col("Year") >= 2021),
-            (pl.col("Month") > 3) | (pl.col("Year") > 2021),
-            (pl.col("propertyState").is_in([state])),
+    return pl.scan_parquet(source).select(_POLICY_COLUMNS)
+
+
+def preprocess_policies(lazy_frame: pl.LazyFrame, state: str) -> pl.LazyFrame:
+    """Lazily filter and engineer features needed for rate change exploration."""
+
+    # Keep renewals effective from April 2021 onward on policies first written
+    # before then, comparing dates as a single year * 12 + month integer.
+    april_2021 = 2021 * 12 + 4
+    effective_month = (
+        pl.col("policyEffectiveDate").dt.year() * 12
+        + pl.col("policyEffectiveDate").dt.month()
+    )
+    new_business_month = (
+        pl.col("originalNBDate").dt.year() * 12 + pl.col("originalNBDate").dt.month()
+    )
+
+    # Apply the selective column filters before the date comparison so the
+    # parquet reader can prune row groups on their statistics.
+    return (
+        lazy_frame.filter(
+            (pl.col("propertyState") == state),
             (pl.col("occupancyType").is_in([1, 11])),
             (pl.col("censusTract") != ""),
             (pl.col("ratedFloodZone") != ""),
-            (pl.col("originalNBDate").dt.year() < 2021)
-            | (pl.col("originalNBDate").dt.month() < 4),
+        )
+        .filter(
+            (effective_month >= april_2021),
+            (new_business_month < april_2021),
         )
         .with_columns(
             (pl.col("policyEffectiveDate") - dt.datetime(2021, 3, 1))
@@ -52,84 +126,144 @@ def preprocess_policies(lazy_frame: pl.LazyFrame, state: str) -> pl.DataFrame:
         .with_columns(
             (pl.col("DaysSinceMarch2021") / 365).floor().alias("YearsSinceMarch2021"),
         )
-        .collect()
     )
 
 
-def compute_policy_cost_changes(df: pl.DataFrame, policy_year: int) -> pl.DataFrame:
-    """Compute policy cost changes between year zero and a specified policy year."""
+def load_preprocessed_policies(data_dir: Path, state: str) -> pl.LazyFrame:
+    """Return the preprocessed policies for *state*, reusing a parquet cache when valid.
 
-    df_original = df.filter(pl.col("YearsSinceMarch2021") == 0).select(
-        ["censusTract", "originalNBDate", "policyCost"]
-    )
-    df_new = df.filter(pl.col("YearsSinceMarch2021") == policy_year).select(
-        ["censusTract", "originalNBDate", "policyCost"]
+    The cache lives under ``Data/cache`` and is keyed on the modification times and
+    sizes of the source parquet and its state partitions, so refreshing either
+    invalidates it.
+    """
+
+    raw = data_dir / "FimaNfipPoliciesV2.parquet"
+    files = ([raw] if raw.exists() else []) + policy_partition_files(data_dir)
+    stats = [path.stat() for path in files]
+    mtime_ns = max(stat.st_mtime_ns for stat in stats)
+    size = sum(stat.st_size for stat in stats)
+    cache_dir = data_dir / "cache"
+    cache_path = cache_dir / (
+        f"{state}_v{_PREPROCESS_CACHE_VERSION}_{mtime_ns}_{size}.parquet"
     )
-    joined = df_original.join(
-        df_new,
-        on=["censusTract", "originalNBDate"],
-        how="inner",
-        suffix=f"_year_{policy_year}",
+    if not cache_path.exists():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in cache_dir.glob(f"{state}_*.parquet"):
+            stale.unlink()
+        tmp_path = cache_path.with_name(f"{cache_path.name}.tmp")
+        preprocess_policies(load_policy_frame(data_dir), state).sink_parquet(
+            tmp_path, compression="zstd", compression_level=3, statistics=True
+        )
+        os.replace(tmp_path, cache_path)
+    return pl.scan_parquet(cache_path)
+
+
+def build_policy_cost_panel(
+    lazy_frame: pl.LazyFrame, policy_years: Iterable[int]
+) -> pl.LazyFrame:
+    """Gather year-zero and per-policy-year costs into one row per policy.
+
+    Policies are identified by census tract and original new-business date; when
+    several rows share a key within a year, the first one is kept.
+    """
+
+    return lazy_frame.group_by(["censusTract", "originalNBDate"]).agg(
+        pl.col("policyCost")
+        .filter(pl.col("YearsSinceMarch2021") == 0)
+        .first()
+        .alias("policyCost"),
+        *(
+            pl.col("policyCost")
+            .filter(pl.col("YearsSinceMarch2021") == policy_year)
+            .first()
+            .alias(f"policyCost_year_{policy_year}")
+            for policy_year in policy_years
+        ),
     )
+
+
+def compute_policy_cost_changes(panel: pl.LazyFrame, policy_year: int) -> pl.LazyFrame:
+    """Build the policy cost changes between year zero and a specified policy year.
+
+    Percent changes are capped at 200%. A zero-cost baseline gives NaN (0/0) or
+    infinity, and NaN is capped to 200% as well so those policies stay in the
+    histograms.
+    """
+
+    new_cost = pl.col(f"policyCost_year_{policy_year}")
     return (
-        joined.with_columns(
-            (
-                pl.col(f"policyCost_year_{policy_year}") - pl.col("policyCost")
-            ).alias(f"PolicyCostChange_year_{policy_year}"),
-            (
-                (
-                    pl.col(f"policyCost_year_{policy_year}")
-                    - pl.col("policyCost")
-                )
-                / pl.col("policyCost")
-            ).alias(f"PolicyCostChangePercent_year_{policy_year}"),
-        )
+        panel.select("censusTract", "originalNBDate", "policyCost", new_cost)
+        .drop_nulls(["policyCost", f"policyCost_year_{policy_year}"])
         .with_columns(
-            pl.when(pl.col(f"PolicyCostChangePercent_year_{policy_year}") > 2)
-            .then(2)
-            .otherwise(pl.col(f"PolicyCostChangePercent_year_{policy_year}"))
+            (new_cost - pl.col("policyCost")).alias(
+                f"PolicyCostChange_year_{policy_year}"
+            ),
+            ((new_cost - pl.col("policyCost")) / pl.col("policyCost"))
+            .fill_nan(2)
+            .clip(upper_bound=2)
             .alias(f"PolicyCostChangePercent_year_{policy_year}"),
         )
     )
 
 
-def plot_histogram(series: pl.Series, title: str, bins: int, output_path: Path | None = None) -> None:
-    """Plot a histogram for the provided Polars series."""
+def histogram_values(series: pl.Series) -> np.ndarray:
+    """Return the non-missing values of *series* as a read-only NumPy array.
 
-    fig = plt.figure(figsize=(10, 5))
-    plt.hist(series.to_numpy(), bins=bins)
-    plt.title(title)
-    plt.xlabel("Policy Cost Change Percent")
-    plt.ylabel("Frequency")
-    if output_path is not None:
-        plt.savefig(output_path)
-    plt.show()
-    plt.close(fig)
+    Nulls and NaNs carry no histogram bin, so they are dropped only when present;
+    a clean single-chunk series is then viewed without copying its buffer.
+    """
+
+    values = series.drop_nulls()
+    if values.dtype.is_float() and values.is_nan().any():
+        values = values.drop_nans()
+    if values.n_chunks() > 1:
+        values = values.rechunk()
+    return values.to_numpy(allow_copy=False, writable=False)
+
+
+def plot_histogram(
+    ax: Axes, series: pl.Series, title: str, bins: int, output_path: Path
+) -> None:
+    """Draw a histogram of the provided Polars series on *ax* and save its figure."""
+
+    counts, edges = np.histogram(histogram_values(series), bins=bins)
+    ax.clear()
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge")
+    ax.set_title(title)
+    ax.set_xlabel("Policy Cost Change Percent")
+    ax.set_ylabel("Frequency")
+    ax.figure.savefig(output_path)
 
 
 def explore_rate_changes(state: str, policy_years: Iterable[int]) -> None:
-    """Explore rate changes and create histograms for the requested policy years."""
+    """Explore rate changes and save histograms for the requested policy years."""
 
     base_path = Path(__file__).parent.parent
     data_dir, figures_dir = prepare_directories(base_path)
-    df = preprocess_policies(load_policy_frame(data_dir), state)
+    policies = load_preprocessed_policies(data_dir, state)
 
-    first_year_changes = compute_policy_cost_changes(df, 1)
-    plot_histogram(
-        first_year_changes["PolicyCostChangePercent_year_1"],
-        "Policy Cost Change Percent",
-        bins=100,
+    # Collect every policy year in one batch so Polars builds the cost panel
+    # once and shares it across the per-year change calculations.
+    policy_years = list(policy_years)
+    panel = build_policy_cost_panel(policies, policy_years)
+    year_changes = pl.collect_all(
+        [compute_policy_cost_changes(panel, year) for year in policy_years]
     )
 
-    for policy_year in policy_years:
-        change_df = compute_policy_cost_changes(df, policy_year)
-        plot_histogram(
-            change_df[f"PolicyCostChangePercent_year_{policy_year}"],
-            f"Policy Cost Change Percent for Policy Year {policy_year}",
-            bins=100,
-            output_path=figures_dir
-            / f"{state}_policy_cost_change_percent_year_{policy_year}.png",
-        )
+    # Reuse one figure for every histogram instead of allocating one per plot.
+    fig, ax = plt.subplots(figsize=(10, 5))
+    try:
+        for policy_year, change_df in zip(policy_years, year_changes):
+            plot_histogram(
+                ax,
+                change_df[f"PolicyCostChangePercent_year_{policy_year}"],
+                f"Policy Cost Change Percent for Policy Year {policy_year}",
+                bins=100,
+                output_path=figures_dir
+                / f"{state}_policy_cost_change_percent_year_{policy_year}.png",
+            )
+    finally:
+        plt.close(fig)
 
 
 def main() -> None:
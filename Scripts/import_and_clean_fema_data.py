@@ -7,6 +7,20 @@ from typing import Sequence, Tuple
 
 import polars as pl
 
+# Only these columns are read from the policy parquet; the rest are never touched.
+_POLICY_COLUMNS: Tuple[str, ...] = (
+    "policyEffectiveDate",
+    "occupancyType",
+    "rateMethod",
+    "censusTract",
+    "ratedFloodZone",
+    "subsidizedRateType",
+    "basicBuildingRate",
+    "additionalBuildingRate",
+    "basicContentsRate",
+    "AdditionalContentsRate",
+)
+
 
 def prepare_data_directory(base_path: Path) -> Path:
     """Ensure the shared data directory exists and return its path."""
@@ -19,7 +33,9 @@ def prepare_data_directory(base_path: Path) -> Path:
 def load_policy_lazy_frame(data_dir: Path) -> pl.LazyFrame:
     """Load the FEMA policy dataset as a lazy frame for efficient filtering."""
 
-    return pl.scan_parquet(data_dir / "FimaNfipPoliciesV2.parquet")
+    return pl.scan_parquet(data_dir / "FimaNfipPoliciesV2.parquet").select(
+        _POLICY_COLUMNS
+    )
 
 
 def prepare_policy_dataframe(lazy_frame: pl.LazyFrame) -> pl.DataFrame:
@@ -71,12 +87,12 @@ def replace_zero_rates(df: pl.DataFrame, rate_columns: Sequence[str]) -> pl.Data
 def determine_flood_zone(df: pl.DataFrame) -> pl.DataFrame:
     """Attach simplified flood zone labels to the policy DataFrame."""
 
-    a_cols = [f"A{str(x).zfill(2)}" for x in range(1, 31)]
-    v_cols = [f"V{str(x).zfill(2)}" for x in range(1, 31)]
+    # Numbered zones A01-A30 / V01-V30 collapse to their letter.
+    zone_number = r"(0[1-9]|[12][0-9]|30)$"
     return df.with_columns(
-        pl.when(pl.col("ratedFloodZone").is_in(a_cols))
+        pl.when(pl.col("ratedFloodZone").str.contains(f"^A{zone_number}"))
         .then(pl.lit("A"))
-        .when(pl.col("ratedFloodZone").is_in(v_cols))
+        .when(pl.col("ratedFloodZone").str.contains(f"^V{zone_number}"))
         .then(pl.lit("V"))
         .when(pl.col("ratedFloodZone").is_in(["AHB"]))
         .then(pl.lit("AH"))
@@ -98,36 +114,29 @@ def compute_tabulations(df: pl.DataFrame) -> Tuple[pl.DataFrame, pl.DataFrame]:
 def compute_census_tract_summary(df: pl.DataFrame) -> pl.DataFrame:
     """Calculate average rate metrics by census tract and flood zone."""
 
-    enriched = df.with_columns(
+    # Average in double precision and narrow only the per-tract results to Float32.
+    return df.group_by(["censusTract", "FloodZoneType"]).agg(
         pl.col("basicBuildingRate")
         .cast(pl.Float64)
         .mean()
-        .over(["censusTract", "FloodZoneType"])
+        .cast(pl.Float32)
         .alias("AverageBasicBuildingRate"),
         pl.col("additionalBuildingRate")
         .cast(pl.Float64)
         .mean()
-        .over(["censusTract", "FloodZoneType"])
+        .cast(pl.Float32)
         .alias("AverageAdditionalBuildingRate"),
         pl.col("basicContentsRate")
         .cast(pl.Float64)
         .mean()
-        .over(["censusTract", "FloodZoneType"])
+        .cast(pl.Float32)
         .alias("AverageBasicContentsRate"),
         pl.col("AdditionalContentsRate")
         .cast(pl.Float64)
         .mean()
-        .over(["censusTract", "FloodZoneType"])
+        .cast(pl.Float32)
         .alias("AverageAdditionalContentsRate"),
     )
-    return enriched.select(
-        pl.col("censusTract"),
-        pl.col("FloodZoneType"),
-        pl.col("AverageBasicBuildingRate"),
-        pl.col("AverageAdditionalBuildingRate"),
-        pl.col("AverageBasicContentsRate"),
-        pl.col("AverageAdditionalContentsRate"),
-    ).unique()
 
 
 def process_policies(base_path: Path) -> pl.DataFrame:
@@ -0,0 +1,54 @@
+"""Rewrite the FEMA policy parquet as a dataset partitioned by property state.
+
+Reads ``Data/FimaNfipPoliciesV2.parquet`` and writes a Hive-partitioned copy to
+``Data/processed/policies_by_state/propertyState=<STATE>/``. Single-state scans of
+the partitioned dataset skip every other state's files before any bytes are read.
+"""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import polars as pl
+
+_PROVENANCE = """# policies_by_state
+
+Hive-partitioned copy of `Data/FimaNfipPoliciesV2.parquet`, split by `propertyState`
+(one `propertyState=<STATE>/` directory per state). Generated by
+`Scripts/repartition_policies.py`; rerun it after refreshing the source parquet.
+Rows and columns are unchanged apart from `propertyState`, which is stored in the
+directory names rather than inside the files.
+"""
+
+
+def repartition_policies(source: Path, output_dir: Path) -> None:
+    """Stream *source* into a state-partitioned parquet dataset at *output_dir*."""
+
+    staging_dir = output_dir.with_name(f"{output_dir.name}.tmp")
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    pl.scan_parquet(source).sink_parquet(
+        pl.PartitionByKey(staging_dir, by="propertyState", include_key=False),
+        compression="zstd",
+        compression_level=3,
+        statistics=True,
+        row_group_size=256_000,
+        mkdir=True,
+    )
+    (staging_dir / "README.md").write_text(_PROVENANCE, encoding="utf-8")
+    shutil.rmtree(output_dir, ignore_errors=True)
+    staging_dir.rename(output_dir)
+
+
+def main() -> None:
+    """Partition the shared policy parquet by property state."""
+
+    data_dir = Path(__file__).parent.parent / "Data"
+    repartition_policies(
+        data_dir / "FimaNfipPoliciesV2.parquet",
+        data_dir / "processed" / "policies_by_state",
+    )
+
+
+if __name__ == "__main__":
+    main()